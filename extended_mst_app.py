@@ -1,6 +1,12 @@
 import streamlit as st
+import numpy as np
+import pandas as pd
 import subprocess
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import sys # Import sys module
 
 # --- Configuration for Universal Pathing ---
@@ -16,43 +22,429 @@ else:
 # Get the absolute path to the directory where the Python script is running
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 C_EXECUTABLE_PATH = os.path.join(BASE_DIR, EXECUTABLE_FILENAME)
-INPUT_FILE_PATH = os.path.join(BASE_DIR, "graph_input.txt")
 
 # ====================================================================
 # Utility Functions for C Communication
 # ====================================================================
-# (The rest of the file remains the same)
-# ...
+
+# The C solver stores weights and costs as 32-bit ints
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+def _in_int32_range(value):
+    return INT32_MIN <= value <= INT32_MAX
+
+def _int32(text):
+    value = int(text)
+    if not _in_int32_range(value):
+        raise ValueError(f"{value} is outside the 32-bit integer range")
+    return value
+
+def _edge_line_problem(line):
+    """Describes what is wrong with one edge line's shape or weight, or returns None."""
+    parts = line.split(',')
+    if len(parts) != 3:
+        return f"Invalid edge line `{line}`. Expected `U,V,Weight`."
+    try:
+        weight = int(parts[2])
+    except ValueError:
+        return f"Invalid edge line `{line}`. Expected `U,V,Weight`."
+    if not _in_int32_range(weight):
+        return f"Weight in edge line `{line}` is outside the 32-bit integer range."
+    return None
+
+def _edge_error_message(edge_lines, node_map):
+    """Rescans rejected edge input and describes the first problem found."""
+    problem = next(filter(None, map(_edge_line_problem, edge_lines)), None)
+    if problem is not None:
+        return problem
+
+    names = {name.strip() for line in edge_lines for name in line.split(',')[:2]}
+    missing = names - node_map.keys()
+    return f"Edges reference undefined nodes: {', '.join(sorted(missing))}."
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def parse_nodes(node_weights_str):
+    """Parses the node text area into (names, weights_line, name_map).
+
+    names is a read-only object array in input order, weights_line the
+    solver's node-weight line already encoded, and name_map maps each name to
+    its index. Cached on the node text alone, so editing only the edges
+    reuses all three; callers must treat them as read-only.
+    """
+    node_weights = {}
+    for line in node_weights_str.strip().splitlines():
+        if not line.strip():
+            continue
+        parts = line.split(',')
+        if len(parts) != 2:
+            raise ValueError(f"Invalid node line `{line}`. Expected `Name,Weight`.")
+        name = parts[0].strip()
+        try:
+            weight = int(parts[1])
+        except ValueError:
+            raise ValueError(f"Invalid node line `{line}`. Expected `Name,Weight`.") from None
+        if not _in_int32_range(weight):
+            raise ValueError(f"Weight in node line `{line}` is outside the 32-bit integer range.")
+        if name in node_weights:
+            raise ValueError(f"Duplicate node `{name}` in line `{line}`.")
+        node_weights[name] = weight
+
+    # An object array lets MST node indices be mapped back by fancy indexing
+    names = np.array(list(node_weights), dtype=object)
+    names.flags.writeable = False
+    weights_line = (' '.join(map(str, node_weights.values())) + "\n").encode('ascii')
+    name_map = {name: i for i, name in enumerate(names)}
+    return names, weights_line, name_map
+
+def emit_edges(edges_str, node_map):
+    """Formats the edge text area as solver input rows.
+
+    Returns (edge_count, edge_block) with edge_block already encoded. Raises
+    ValueError on malformed lines or undefined nodes.
+    """
+    edge_lines = [line for line in edges_str.splitlines() if line.strip()]
+    try:
+        # One pass does the name -> index rewrite, the weight check and the formatting
+        edge_rows = [
+            f"{node_map[u.strip()]} {node_map[v.strip()]} {_int32(w_e)}"
+            for u, v, w_e in (line.split(',') for line in edge_lines)
+        ]
+    except (KeyError, ValueError):
+        # Slow path only on bad input
+        raise ValueError(_edge_error_message(edge_lines, node_map)) from None
+
+    return len(edge_rows), ("\n".join(edge_rows) + "\n").encode('ascii')
+
 def generate_input_file(node_weights_str, edges_str):
-    # ... (function body unchanged)
-    pass 
-
-def run_c_solver():
-    """Executes the compiled C program and captures its stdout."""
-    st.info(f"Executing C program: {C_EXECUTABLE_PATH}")
-    
-    if not os.path.exists(C_EXECUTABLE_PATH):
-        st.error(f"C executable not found. Checked path: `{C_EXECUTABLE_PATH}`")
-        # Updated warning message to reflect the universal naming
-        st.warning(f"Ensure you compiled to **{EXECUTABLE_FILENAME}** and placed it in the script's folder.")
-        return None
+    """Parses the UI text areas into the C solver's input format.
+
+    Returns (payload, nodes): the bytes to send to the solver and the
+    ordered node names, since the C program refers to nodes by their
+    position in this sequence. Raises ValueError on malformed input.
+    """
+    nodes, weights_line, node_map = parse_nodes(node_weights_str)
+    edge_count, edge_block = emit_edges(edges_str, node_map)
+
+    # Only the counts line and the edges are built per call; the node part is cached
+    payload = b"".join((b"%d %d\n" % (len(nodes), edge_count), weights_line, edge_block))
+    return payload, nodes
 
+class SolverError(RuntimeError):
+    """Raised when the C solver cannot be run or exits with an error."""
+
+@st.cache_resource(show_spinner=False)
+def get_solver():
+    """Starts the C program in daemon mode once and shares it across reruns.
+
+    The executable is only looked up when the daemon is (re)started; a missing
+    binary surfaces from Popen itself rather than from a separate stat call.
+    """
     try:
-        # Pass the absolute path to both the executable and the input file
-        result = subprocess.run(
-            [C_EXECUTABLE_PATH, INPUT_FILE_PATH], 
-            capture_output=True, 
-            text=True, 
-            check=True
+        return subprocess.Popen(
+            [C_EXECUTABLE_PATH, "--daemon"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
         )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        st.error(f"C program (Extended MST) failed with exit code {e.returncode}.")
-        st.code(f"STDERR:\n{e.stderr}\n\nSTDOUT:\n{e.stdout}")
-        return None
-    except FileNotFoundError:
-        st.error(f"C executable not found (Permission/OS error). Checked path: `{C_EXECUTABLE_PATH}`")
-        return None
-
-# ... (The rest of the Streamlit interface functions and main block remain unchanged)
-# ...
+    except FileNotFoundError as e:
+        raise SolverError(
+            f"C executable not found. Checked path: `{C_EXECUTABLE_PATH}`. "
+            f"Ensure you compiled to **{EXECUTABLE_FILENAME}** and placed it in the script's folder."
+        ) from e
+    except OSError as e:
+        raise SolverError(f"C executable could not be started (Permission/OS error). Checked path: `{C_EXECUTABLE_PATH}`") from e
+
+@st.cache_resource(show_spinner=False)
+def get_solver_lock():
+    """Serialises requests to the shared daemon, whose pipe carries one at a time."""
+    return threading.Lock()
+
+DEFAULT_SOLVER_WORKERS = 4
+
+def _solver_workers():
+    """Reads SOLVER_WORKERS, falling back to the default if it is unset or invalid."""
+    try:
+        workers = int(os.environ.get("SOLVER_WORKERS", DEFAULT_SOLVER_WORKERS))
+    except ValueError:
+        return DEFAULT_SOLVER_WORKERS
+    return workers if workers > 0 else DEFAULT_SOLVER_WORKERS
+
+@st.cache_resource(show_spinner=False)
+def get_pool():
+    """Worker threads that run solves off the script thread.
+
+    Every solver call still serialises on the single daemon, so extra workers
+    do not solve graphs concurrently; they only let cache hits and input
+    preparation for other sessions proceed while one solve is in flight.
+    """
+    return ThreadPoolExecutor(max_workers=_solver_workers())
+
+# Each reply record is six int32s; see the streaming protocol in mst_solver.c
+RECORD_BYTES = 24
+READ_CHUNK_BYTES = 64 * 1024
+
+class SolveJob:
+    """Links a solve running on a worker thread to the script thread that started it.
+
+    The worker pushes blocks of MST records onto `records` as the daemon emits
+    them, and the script thread may call cancel() to abandon the solve.
+    """
+
+    def __init__(self):
+        self.records = queue.Queue()
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._proc = None
+
+    def attach(self, proc):
+        with self._lock:
+            if self.cancelled:
+                raise SolverError("Solve cancelled.")
+            self._proc = proc
+
+    def detach(self):
+        with self._lock:
+            self._proc = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._proc is not None:
+                # The daemon can only be stopped mid-solve by killing it; the
+                # next request starts a fresh one
+                self._proc.kill()
+
+def run_c_solver(payload, job=None):
+    """Sends one length-prefixed request to the solver daemon and returns its records.
+
+    The result is an (n + 1, 6) int32 array: the MST edges in the order Kruskal
+    accepted them, then the trailer record. If a SolveJob is given, edge
+    records are also pushed to it as soon as they arrive.
+    """
+    with get_solver_lock():
+        return _exchange(payload, job)
+
+def _read_exact(stream, n):
+    data = stream.read(n)
+    if len(data) != n:
+        raise EOFError(f"Expected {n} bytes from the solver, got {len(data)}.")
+    return data
+
+def _read_records(stream, sink):
+    # read1 returns whatever the daemon has flushed so far, so each edge can
+    # be handed on as soon as it is accepted
+    blocks = []
+    pending = b""
+    while True:
+        data = stream.read1(READ_CHUNK_BYTES)
+        if not data:
+            raise EOFError("The solver closed its output in the middle of a reply.")
+        pending += data
+        usable = len(pending) - len(pending) % RECORD_BYTES
+        if not usable:
+            continue
+        block = np.frombuffer(pending[:usable], dtype=np.int32).reshape(-1, 6)
+        pending = pending[usable:]
+        blocks.append(block)
+
+        # The trailer (u_idx -1) is the last thing written for a request
+        finished = block[-1, 0] == -1
+        edges = block[:-1] if finished else block
+        if sink is not None and len(edges):
+            sink.put(edges)
+        if finished:
+            return np.concatenate(blocks)
+
+def _exchange(payload, job):
+    proc = get_solver()
+    if proc.poll() is not None:
+        # The daemon died since the last request; start a fresh one
+        get_solver.clear()
+        proc = get_solver()
+
+    if job is not None:
+        job.attach(proc)
+    try:
+        # Separate writes avoid copying the payload just to prepend the header
+        proc.stdin.write(b"%d\n" % len(payload))
+        proc.stdin.write(payload)
+        proc.stdin.flush()
+        header = proc.stdout.readline().split()
+        if header == [b"OK"]:
+            return _read_records(proc.stdout, job.records if job is not None else None)
+        status, length = header
+        message = _read_exact(proc.stdout, int(length))
+    except (OSError, ValueError, EOFError) as e:
+        # Broken pipe, a garbled frame or a cancel: the stream can't be trusted any more
+        proc.kill()
+        get_solver.clear()
+        if job is not None and job.cancelled:
+            raise SolverError("Solve cancelled.") from e
+        raise SolverError(f"C program (Extended MST) stopped responding (exit code {proc.wait()}).") from e
+    finally:
+        if job is not None:
+            job.detach()
+
+    raise SolverError(f"C program (Extended MST) rejected the input: {message.decode('ascii', 'replace')}")
+
+MST_COLUMNS = ['u', 'v', 'w_e', 'w_u', 'w_v', 'C_e']
+
+# Status codes in the trailer record; see MST_* in graph.h
+MST_OK, MST_DISCONNECTED, MST_NO_MEMORY, MST_OVERFLOW = 0, 1, 2, 3
+STATUS_ERRORS = {
+    MST_NO_MEMORY: "C program (Extended MST) ran out of memory.",
+    MST_OVERFLOW: "An MST cost exceeds the 32-bit integer range.",
+}
+
+def _lookup_names(names, idx):
+    """Maps node indices to names; indices outside the node list fall back to their number."""
+    valid = (idx >= 0) & (idx < len(names))
+    if valid.all():
+        return names[idx]
+    looked_up = idx.astype(str).astype(object)
+    looked_up[valid] = names[idx[valid]]
+    return looked_up
+
+def records_to_frame(records, node_names):
+    """Turns an (n, 6) int32 record array into the MST DataFrame."""
+    # No copy when node_names is already the object array from parse_nodes
+    names = np.asarray(node_names, dtype=object)
+    mst_edges = pd.DataFrame({
+        'u': _lookup_names(names, records[:, 0]),
+        'v': _lookup_names(names, records[:, 1]),
+        'w_e': records[:, 2],
+        'w_u': records[:, 3],
+        'w_v': records[:, 4],
+        'C_e': records[:, 5],
+    })
+    mst_edges['Edge'] = mst_edges['u'] + ' - ' + mst_edges['v']
+    return mst_edges
+
+def parse_c_output(records, node_names):
+    """Turns the solver's records into (total_cost, mst_edges).
+
+    records holds one row per MST edge (u_idx, v_idx, w_e, w_u, w_v, C_e)
+    followed by the trailer (-1, status, total_cost, n_edges, 0, 0). mst_edges
+    is a DataFrame with those columns, node indices replaced by names, plus a
+    display `Edge` column. A disconnected graph gives (None, empty DataFrame).
+    Raises SolverError for a malformed reply or a failed solve.
+    """
+    if records.ndim != 2 or not len(records) or records[-1, 0] != -1:
+        raise SolverError("Could not parse the C program's output.")
+
+    _, status, total_cost, n = (int(x) for x in records[-1, :4])
+    edges = records[:-1]
+    if status == MST_DISCONNECTED:
+        return None, pd.DataFrame(columns=MST_COLUMNS + ['Edge'])
+    if status in STATUS_ERRORS:
+        raise SolverError(STATUS_ERRORS[status])
+    if status != MST_OK or len(edges) != n:
+        raise SolverError(f"C program (Extended MST) returned a malformed reply (status {status}).")
+    return total_cost, records_to_frame(edges, node_names)
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def solve(node_input, edge_input, _job=None):
+    """Runs the full parse -> C solver -> parse pipeline for one pair of inputs.
+
+    Cached on the two input strings, so re-running an unchanged graph is a
+    memory lookup instead of a subprocess launch. Errors propagate as
+    exceptions and are therefore never cached. _job, excluded from the cache
+    key, receives the MST records as they stream in on a cache miss.
+    """
+    payload, nodes = generate_input_file(node_input, edge_input)
+    records = run_c_solver(payload, _job)
+    total_cost, mst_edges = parse_c_output(records, nodes)
+    return total_cost, mst_edges, nodes
+
+# ====================================================================
+# Streamlit Interface
+# ====================================================================
+
+def render_results(total_cost, mst_edges):
+    """Draws the results pane for one solve."""
+    if total_cost is None:
+        st.error("The graph is disconnected: no spanning tree exists.")
+    else:
+        st.success(f"Minimum Extended Spanning Tree cost: **{total_cost}**")
+
+        st.dataframe(
+            mst_edges,
+            column_order=['Edge', 'w_e', 'w_u', 'w_v', 'C_e'],
+            column_config={'C_e': 'C_e = w_e + w_u + w_v'},
+            hide_index=True,
+            width='stretch',
+        )
+
+        st.markdown(
+            f"**Total Cost Sum:** {' + '.join(map(str, mst_edges['C_e'].tolist()))} = **{total_cost}**"
+        )
+
+DEFAULT_NODES = "A,10\nB,5\nC,3\nD,1"
+DEFAULT_EDGES = "A,B,2\nB,C,3\nC,D,4\nA,D,5\nB,D,1"
+
+st.title("Extended MST Solver")
+st.markdown(
+    "Finds the spanning tree minimising the **effective edge cost** "
+    "$C_e = w_e + w_u + w_v$, computed by the C backend."
+)
+
+col_nodes, col_edges = st.columns(2)
+with col_nodes:
+    node_input = st.text_area("Nodes (`Name,Weight` per line)", DEFAULT_NODES, height=200)
+with col_edges:
+    edge_input = st.text_area("Edges (`U,V,Weight` per line)", DEFAULT_EDGES, height=200)
+
+if st.button("Calculate Extended MST", type="primary"):
+    # Solve on a worker thread so the script thread stays free to report progress
+    status = st.empty()
+    cancel_slot = st.empty()
+    partial = st.empty()
+    job = SolveJob()
+    future = get_pool().submit(solve, node_input, edge_input, job)
+    # Pressing Cancel (or any other widget) reruns the script, which interrupts
+    # the loop below and cancels the solve in the finally block
+    cancel_slot.button("Cancel")
+
+    names = None
+    blocks = []
+    received = drawn = 0
+    started = time.monotonic()
+    try:
+        while not future.done():
+            while not job.records.empty():
+                block = job.records.get_nowait()
+                blocks.append(block)
+                received += len(block)
+            status.info(f"Solving... {time.monotonic() - started:.1f}s, {received} MST edges received")
+            if received >= 2 * drawn + 1:
+                # Redrawing only when the table has doubled keeps the total
+                # conversion work linear in the number of edges
+                blocks = [np.concatenate(blocks)]
+                if names is None:
+                    # Records only arrive once the worker has parsed the input
+                    names = parse_nodes(node_input)[0]
+                partial.dataframe(
+                    records_to_frame(blocks[0], names),
+                    column_order=['Edge', 'w_e', 'w_u', 'w_v', 'C_e'],
+                    hide_index=True,
+                    width='stretch',
+                )
+                drawn = received
+            time.sleep(0.05)
+    finally:
+        if not future.done():
+            future.cancel()
+            job.cancel()
+    status.empty()
+    cancel_slot.empty()
+    partial.empty()
+
+    try:
+        total_cost, mst_edges, nodes = future.result()
+    except ValueError as e:
+        st.error(f"Invalid input: {e}")
+        st.stop()
+    except SolverError as e:
+        st.error(str(e))
+        st.stop()
+
+    render_results(total_cost, mst_edges)
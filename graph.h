@@ -4,6 +4,7 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <limits.h>
+#include <stdint.h>
 
 // --- Data Structures ---
 
@@ -32,9 +33,16 @@ void setNodeWeight(Graph* graph, int node_id, int weight);
 void addEdge(Graph* graph, int edge_index, int u, int v, int weight);
 void freeGraph(Graph* graph);
 
+// --- MST Status Codes ---
+#define MST_OK 0
+#define MST_DISCONNECTED 1
+#define MST_NO_MEMORY 2
+#define MST_OVERFLOW 3
+
 // --- MST Solver Prototypes ---
 int compareEdges(const void* a, const void* b);
-int findExtendedMST(Graph* graph, Edge** mst_edges_out);
-void print_mst_result(int total_cost, const Edge* mst_edges, int num_edges, const Graph* graph);
+typedef void (*EdgeCallback)(const Edge* edge, const Graph* graph, void* ctx);
+int findExtendedMST(Graph* graph, Edge** mst_edges_out, int* total_cost_out, EdgeCallback on_edge, void* ctx);
+char* format_mst_result(int status, int total_cost, const Edge* mst_edges, int num_edges, const Graph* graph, size_t* len_out);
 
 #endif
@@ -1,5 +1,11 @@
 #include "graph.h"
 #include <string.h>
+#include <errno.h>
+
+#ifdef _WIN32
+#include <fcntl.h>
+#include <io.h>
+#endif
 
 // --- Graph Functions (Implementation) ---
 
@@ -44,43 +50,50 @@ void freeGraph(Graph* graph) {
 int compareEdges(const void* a, const void* b) {
     const Edge* edgeA = (const Edge*)a;
     const Edge* edgeB = (const Edge*)b;
-    return edgeA->effective_cost - edgeB->effective_cost;
+    // Compare rather than subtract: the difference of two ints can overflow
+    return (edgeA->effective_cost > edgeB->effective_cost) - (edgeA->effective_cost < edgeB->effective_cost);
 }
 
 // --- Extended MST Core Logic ---
 
-static void calculateEffectiveCosts(Graph* graph) {
+// Returns 0 if some effective cost does not fit in an int, 1 otherwise.
+static int calculateEffectiveCosts(Graph* graph) {
     for (int i = 0; i < graph->E; i++) {
         int u = graph->edges[i].u;
         int v = graph->edges[i].v;
-        int w_e = graph->edges[i].weight;
+        long long w_e = graph->edges[i].weight;
         
         if (u >= 0 && u < graph->V && v >= 0 && v < graph->V) {
-            int w_u = graph->node_weights[u];
-            int w_v = graph->node_weights[v];
-            graph->edges[i].effective_cost = w_e + w_u + w_v;
+            long long cost = w_e + graph->node_weights[u] + graph->node_weights[v];
+            if (cost < INT_MIN || cost > INT_MAX) return 0;
+            graph->edges[i].effective_cost = (int)cost;
         } else {
             graph->edges[i].effective_cost = INT_MAX; 
         }
     }
+    return 1;
 }
 
-int findExtendedMST(Graph* graph, Edge** mst_edges_out) {
-    int total_cost = 0;
+// Runs Kruskal on the effective costs. Returns an MST_* status; on MST_OK the
+// tree's edges and total cost are stored in the out parameters. If on_edge is
+// given it is called for each edge as soon as Kruskal accepts it.
+int findExtendedMST(Graph* graph, Edge** mst_edges_out, int* total_cost_out, EdgeCallback on_edge, void* ctx) {
+    long long total_cost = 0;
     int edges_in_mst = 0;
     int V = graph->V;
     int E = graph->E;
 
-    if (V <= 1) return 0;
+    *total_cost_out = 0;
+    if (V <= 1) return MST_OK;
     
-    calculateEffectiveCosts(graph);
+    if (!calculateEffectiveCosts(graph)) return MST_OVERFLOW;
     qsort(graph->edges, E, sizeof(Edge), compareEdges);
 
     initDSU(V);
-    if (!find(0) && V > 0) { return -1; }
+    if (find(0) == -1) { return MST_NO_MEMORY; } // DSU allocation failed
 
     *mst_edges_out = (Edge*)malloc((V - 1) * sizeof(Edge));
-    if (!*mst_edges_out) { cleanupDSU(); return -1; }
+    if (!*mst_edges_out) { cleanupDSU(); return MST_NO_MEMORY; }
 
     for (int i = 0; i < E && edges_in_mst < V - 1; i++) {
         Edge current_edge = graph->edges[i];
@@ -89,6 +102,7 @@ int findExtendedMST(Graph* graph, Edge** mst_edges_out) {
             (*mst_edges_out)[edges_in_mst] = current_edge;
             total_cost += current_edge.effective_cost;
             edges_in_mst++;
+            if (on_edge) on_edge(&current_edge, graph, ctx);
         }
     }
 
@@ -97,78 +111,264 @@ int findExtendedMST(Graph* graph, Edge** mst_edges_out) {
     if (edges_in_mst != V - 1) {
         free(*mst_edges_out);
         *mst_edges_out = NULL;
-        return -1; // Disconnected graph
+        return MST_DISCONNECTED;
     }
 
-    return total_cost;
+    if (total_cost < INT_MIN || total_cost > INT_MAX) return MST_OVERFLOW;
+    *total_cost_out = (int)total_cost;
+    return MST_OK;
 }
 
-void print_mst_result(int total_cost, const Edge* mst_edges, int num_edges, const Graph* graph) {
-    printf("TOTAL_COST:%d\n", total_cost);
-    printf("MST_EDGES_START\n");
-    for (int i = 0; i < num_edges; i++) {
-        // Output format: u_idx,v_idx,w_e,w_u,w_v,C_e
-        printf("%d,%d,%d,%d,%d,%d\n",
-               mst_edges[i].u,
-               mst_edges[i].v,
-               mst_edges[i].weight,
-               graph->node_weights[mst_edges[i].u],
-               graph->node_weights[mst_edges[i].v],
-               mst_edges[i].effective_cost);
+// Renders the result in the text protocol into a heap buffer (caller frees).
+// status is MST_OK or MST_DISCONNECTED.
+char* format_mst_result(int status, int total_cost, const Edge* mst_edges, int num_edges, const Graph* graph, size_t* len_out) {
+    // 6 ints of at most 11 chars each, 5 commas and a newline per edge
+    size_t cap = 64 + (size_t)num_edges * 80;
+    char* buf = (char*)malloc(cap);
+    if (!buf) return NULL;
+
+    size_t len;
+    if (status == MST_DISCONNECTED) {
+        len = snprintf(buf, cap, "DISCONNECTED\n");
+    } else {
+        len = snprintf(buf, cap, "TOTAL_COST:%d\n", total_cost);
+        len += snprintf(buf + len, cap - len, "MST_EDGES_START\n");
+        for (int i = 0; i < num_edges; i++) {
+            // Output format: u_idx,v_idx,w_e,w_u,w_v,C_e
+            len += snprintf(buf + len, cap - len, "%d,%d,%d,%d,%d,%d\n",
+                            mst_edges[i].u,
+                            mst_edges[i].v,
+                            mst_edges[i].weight,
+                            graph->node_weights[mst_edges[i].u],
+                            graph->node_weights[mst_edges[i].v],
+                            mst_edges[i].effective_cost);
+        }
+        len += snprintf(buf + len, cap - len, "MST_EDGES_END\n");
     }
-    printf("MST_EDGES_END\n");
+
+    *len_out = len;
+    return buf;
 }
 
-// --- Main Driver for Streamlit Integration ---
+// --- Binary Streaming Protocol ---
+//
+// The MST is written as records of six native-endian int32s. Each accepted
+// edge is (u_idx, v_idx, w_e, w_u, w_v, C_e) and is flushed as soon as Kruskal
+// takes it. A trailer record (-1, status, total_cost, n_edges, 0, 0) ends the
+// reply; u_idx -1 never occurs in an edge because endpoints are validated.
 
-int main(int argc, char *argv[]) {
-    if (argc != 2) {
-        fprintf(stderr, "ERROR: Missing input file path. Usage: %s <input_file_path>\n", argv[0]);
-        return 1;
-    }
+typedef struct {
+    FILE* out;
+    int count;
+} EdgeStream;
 
-    FILE *fp = fopen(argv[1], "r");
-    if (!fp) {
-        fprintf(stderr, "ERROR: Could not open input file: %s\n", argv[1]);
-        return 1;
-    }
+static void streamEdge(const Edge* edge, const Graph* graph, void* ctx) {
+    EdgeStream* stream = (EdgeStream*)ctx;
+    int32_t rec[6] = {
+        edge->u,
+        edge->v,
+        edge->weight,
+        graph->node_weights[edge->u],
+        graph->node_weights[edge->v],
+        edge->effective_cost,
+    };
+    fwrite(rec, sizeof rec, 1, stream->out);
+    fflush(stream->out);
+    stream->count++;
+}
+
+static void streamTrailer(EdgeStream* stream, int status, int total_cost) {
+    int32_t rec[6] = { -1, status, status == MST_OK ? total_cost : 0, stream->count, 0, 0 };
+    fwrite(rec, sizeof rec, 1, stream->out);
+    fflush(stream->out);
+}
+
+// --- Input Parsing ---
+
+static const char MSG_BAD_INPUT[] = "ERROR: Malformed graph input.";
+static const char MSG_BAD_EDGE[] = "ERROR: Edge endpoint out of range.";
+static const char MSG_NO_MEMORY[] = "ERROR: Out of memory.";
+static const char MSG_OVERFLOW[] = "ERROR: Cost exceeds the 32-bit integer range.";
 
+static int nextInt(const char** p, int* out) {
+    char* end;
+    errno = 0;
+    long val = strtol(*p, &end, 10);
+    if (end == *p) return 0;
+    if (errno == ERANGE || val < INT_MIN || val > INT_MAX) return 0;
+    *out = (int)val;
+    *p = end;
+    return 1;
+}
+
+// Parses "V E", V node weights, then E "u v w" triples. Returns NULL and sets
+// *error on malformed input, an endpoint outside [0, V) or allocation failure.
+static Graph* parseGraph(const char* input, const char** error) {
+    const char* p = input;
     int V, E;
-    if (fscanf(fp, "%d %d\n", &V, &E) != 2) { goto error_exit; }
-    
+    *error = MSG_BAD_INPUT;
+    if (!nextInt(&p, &V) || !nextInt(&p, &E) || V < 0 || E < 0) return NULL;
+
     Graph* graph = createGraph(V, E);
-    if (!graph) { goto error_exit; }
+    if (!graph) { *error = MSG_NO_MEMORY; return NULL; }
 
     for (int i = 0; i < V; i++) {
         int weight;
-        if (fscanf(fp, "%d", &weight) != 1) { goto error_cleanup; }
+        if (!nextInt(&p, &weight)) { freeGraph(graph); return NULL; }
         setNodeWeight(graph, i, weight);
     }
 
     for (int i = 0; i < E; i++) {
         int u, v, w;
-        if (fscanf(fp, "%d %d %d", &u, &v, &w) != 3) { goto error_cleanup; }
+        if (!nextInt(&p, &u) || !nextInt(&p, &v) || !nextInt(&p, &w)) { freeGraph(graph); return NULL; }
+        // The DSU indexes parent[] by endpoint, so a bad index would corrupt the
+        // heap of the long-lived daemon
+        if (u < 0 || u >= V || v < 0 || v >= V) { *error = MSG_BAD_EDGE; freeGraph(graph); return NULL; }
         addEdge(graph, i, u, v, w);
     }
-    
-    fclose(fp);
-    
+    *error = NULL;
+    return graph;
+}
+
+static char* readAll(FILE* fp) {
+    size_t cap = 4096, len = 0, n;
+    char* buf = (char*)malloc(cap);
+    if (!buf) return NULL;
+
+    while ((n = fread(buf + len, 1, cap - len - 1, fp)) > 0) {
+        len += n;
+        if (cap - len == 1) {
+            char* grown = (char*)realloc(buf, cap * 2);
+            if (!grown) { free(buf); return NULL; }
+            buf = grown;
+            cap *= 2;
+        }
+    }
+    buf[len] = '\0';
+    return buf;
+}
+
+// Solves one graph given as text and returns the text-format result, or NULL
+// with *error set if the input is malformed, a cost overflows or memory runs out.
+static char* solveToBuffer(const char* input, size_t* len_out, const char** error) {
+    Graph* graph = parseGraph(input, error);
+    if (!graph) return NULL;
+
     Edge* mst_result_edges = NULL;
-    int total_cost = findExtendedMST(graph, &mst_result_edges);
-    
-    if (total_cost == -1) {
-        printf("TOTAL_COST:-1\n");
+    int total_cost;
+    int status = findExtendedMST(graph, &mst_result_edges, &total_cost, NULL, NULL);
+    char* out = NULL;
+    if (status == MST_OVERFLOW) {
+        *error = MSG_OVERFLOW;
+    } else if (status == MST_NO_MEMORY) {
+        *error = MSG_NO_MEMORY;
     } else {
-        print_mst_result(total_cost, mst_result_edges, V - 1, graph);
+        // A spanning tree has V - 1 edges; an empty graph has none
+        int num_edges = graph->V > 1 ? graph->V - 1 : 0;
+        out = format_mst_result(status, total_cost, mst_result_edges, num_edges, graph, len_out);
+        if (!out) *error = MSG_NO_MEMORY;
     }
 
     if (mst_result_edges) free(mst_result_edges);
     freeGraph(graph);
-    return 0;
+    return out;
+}
+
+// Solves one graph given as text and streams the MST to out in the binary
+// protocol, preceded by header if it is not NULL. Returns 0 with *error set,
+// having written nothing, if the input is rejected.
+static int solveStreaming(const char* input, FILE* out, const char* header, const char** error) {
+    Graph* graph = parseGraph(input, error);
+    if (!graph) return 0;
 
-error_cleanup:
+    if (header) fputs(header, out);
+    EdgeStream stream = { out, 0 };
+    Edge* mst_result_edges = NULL;
+    int total_cost;
+    int status = findExtendedMST(graph, &mst_result_edges, &total_cost, streamEdge, &stream);
+    streamTrailer(&stream, status, total_cost);
+
+    if (mst_result_edges) free(mst_result_edges);
     freeGraph(graph);
-error_exit:
-    if (fp) fclose(fp);
     return 1;
 }
+
+// --- Daemon Mode ---
+
+// Stops Windows from translating "\n" in the framed and binary streams.
+static void setBinaryStdio(void) {
+#ifdef _WIN32
+    _setmode(_fileno(stdin), _O_BINARY);
+    _setmode(_fileno(stdout), _O_BINARY);
+#endif
+}
+
+// Serves requests framed as "<len>\n<payload>" on stdin until EOF. Each reply
+// is "OK\n" followed by the binary record stream, or "ERR <len>\n<message>".
+static int runDaemon(void) {
+    setBinaryStdio();
+    long len;
+
+    while (scanf("%ld", &len) == 1 && getchar() == '\n' && len >= 0) {
+        char* input = (char*)malloc((size_t)len + 1);
+        if (!input) return 1;
+        if (fread(input, 1, (size_t)len, stdin) != (size_t)len) { free(input); return 1; }
+        input[len] = '\0';
+
+        const char* error;
+        int ok = solveStreaming(input, stdout, "OK\n", &error);
+        free(input);
+
+        if (!ok) {
+            printf("ERR %lu\n", (unsigned long)strlen(error));
+            fputs(error, stdout);
+        }
+        fflush(stdout);
+    }
+    return 0;
+}
+
+// --- Main Driver for Streamlit Integration ---
+
+int main(int argc, char *argv[]) {
+    if (argc != 2) {
+        fprintf(stderr, "ERROR: Missing input file path. Usage: %s <input_file_path | - | --daemon>\n", argv[0]);
+        return 1;
+    }
+
+    if (strcmp(argv[1], "--daemon") == 0) return runDaemon();
+
+    // "-" reads the graph from stdin and answers in the binary protocol for
+    // programmatic callers; a file path gets the human-readable text format
+    int from_stdin = strcmp(argv[1], "-") == 0;
+    if (from_stdin) setBinaryStdio();
+    FILE *fp = from_stdin ? stdin : fopen(argv[1], "r");
+    if (!fp) {
+        fprintf(stderr, "ERROR: Could not open input file: %s\n", argv[1]);
+        return 1;
+    }
+
+    char* input = readAll(fp);
+    if (!from_stdin) fclose(fp);
+    if (!input) return 1;
+
+    const char* error;
+    if (from_stdin) {
+        int ok = solveStreaming(input, stdout, NULL, &error);
+        free(input);
+        if (!ok) fprintf(stderr, "%s\n", error);
+        return ok ? 0 : 1;
+    }
+
+    size_t out_len;
+    char* out = solveToBuffer(input, &out_len, &error);
+    free(input);
+    if (!out) {
+        fprintf(stderr, "%s\n", error);
+        return 1;
+    }
+
+    fwrite(out, 1, out_len, stdout);
+    free(out);
+    return 0;
+}
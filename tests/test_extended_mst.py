@@ -0,0 +1,92 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import extended_mst_app as app  # noqa: E402
+
+NODES = app.DEFAULT_NODES
+EDGES = app.DEFAULT_EDGES
+
+
+@pytest.fixture(autouse=True)
+def solver(tmp_path, monkeypatch):
+    compiler = shutil.which("gcc") or shutil.which("cc")
+    if compiler is None:
+        pytest.skip("No C compiler available to build the solver.")
+    binary = str(tmp_path / app.EXECUTABLE_FILENAME)
+    sources = [os.path.join(ROOT, "mst_solver.c"), os.path.join(ROOT, "dsu.c")]
+    subprocess.run([compiler, "-O2", "-o", binary, *sources], check=True)
+
+    monkeypatch.setattr(app, "C_EXECUTABLE_PATH", binary)
+    app.get_solver.clear()
+    app.solve.clear()
+    yield
+    app.get_solver().kill()
+    app.get_solver.clear()
+    app.solve.clear()
+
+
+def test_normal_graph():
+    total_cost, mst_edges, _ = app.solve(NODES, EDGES)
+    assert total_cost == 31
+    assert sorted(mst_edges['Edge']) == ["A - D", "B - D", "C - D"]
+    assert mst_edges['C_e'].sum() == 31
+
+
+def test_empty_graph():
+    total_cost, mst_edges, _ = app.solve("", "")
+    assert total_cost == 0
+    assert mst_edges.empty
+
+
+def test_single_node():
+    total_cost, mst_edges, _ = app.solve("A,7", "")
+    assert total_cost == 0
+    assert mst_edges.empty
+
+
+def test_disconnected_graph():
+    total_cost, mst_edges, _ = app.solve("A,1\nB,2\nC,3", "A,B,4")
+    assert total_cost is None
+    assert mst_edges.empty
+
+
+def test_rejected_input_leaves_daemon_usable():
+    # Edge endpoint 5 is outside the two declared nodes
+    with pytest.raises(app.SolverError, match="rejected the input"):
+        app.run_c_solver(b"2 1\n1 1\n0 5 1\n")
+    total_cost, _, _ = app.solve(NODES, EDGES)
+    assert total_cost == 31
+
+
+def test_cancel_then_resolve():
+    class CancelOnAttach(app.SolveJob):
+        def attach(self, proc):
+            super().attach(proc)
+            self.cancel()
+
+    payload, _ = app.generate_input_file(NODES, EDGES)
+    with pytest.raises(app.SolverError, match="Solve cancelled"):
+        app.run_c_solver(payload, CancelOnAttach())
+
+    total_cost, mst_edges, _ = app.solve(NODES, EDGES)
+    assert total_cost == 31
+    assert len(mst_edges) == 3
+
+
+def test_streamed_records_match_result():
+    job = app.SolveJob()
+    payload, _ = app.generate_input_file(NODES, EDGES)
+    records = app.run_c_solver(payload, job)
+
+    streamed = []
+    while not job.records.empty():
+        streamed.extend(job.records.get_nowait().tolist())
+    assert streamed == records[:-1].tolist()
+    assert records[-1].tolist() == [-1, app.MST_OK, 31, 3, 0, 0]